@@ -1,20 +1,72 @@
 from __future__ import annotations
 
+import heapq
 import os
-from dataclasses import dataclass
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from operator import attrgetter
 from datetime import date, timedelta
 from calendar import monthrange
-from typing import Optional, List
+from typing import TYPE_CHECKING, Iterator, Optional, List
 
 import requests
-from fast_flights import FlightData, Passengers, Result, get_flights
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    from fast_flights import Passengers, Result
+
+# JSON: orjson -> ujson -> 표준 json
+try:
+    import orjson
+
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    try:
+        import ujson as _json
+    except ImportError:
+        import json as _json
+
+    def json_dumps(obj) -> bytes:
+        return _json.dumps(obj).encode("utf-8")
+
+    json_loads = _json.loads
+
+
+__all__ = [
+    "FlightOption",
+    "HotelOption",
+    "LITEAPI_BACKOFF_SECONDS",
+    "LITEAPI_BUCKET",
+    "LITEAPI_HEADERS",
+    "LITEAPI_SESSION",
+    "LITEAPI_TIMEOUT",
+    "TokenBucket",
+    "clear_caches",
+    "fetch_flights",
+    "load_fast_flights",
+    "find_cheapest_flight_in_month",
+    "json_dumps",
+    "json_loads",
+    "month_dates",
+    "parse_price_to_float",
+    "search_flights_for_date",
+    "search_hotels_for_dates",
+]
 
 
 # ==========================
 #  Data structures
 # ==========================
 
-@dataclass
+@dataclass(slots=True)
 class FlightOption:
     depart_date: date
     return_date: Optional[date]
@@ -23,7 +75,7 @@ class FlightOption:
     airline: str
 
 
-@dataclass
+@dataclass(slots=True)
 class HotelOption:
     rank: int
     hotel_id: str
@@ -33,6 +85,31 @@ class HotelOption:
     total_price: float
     currency: str
     refundable_tag: str
+    # LiteAPI 장애로 대신 돌려준 저장본
+    stale: bool = False
+
+    _COLUMNS = (
+        "rank",
+        "name",
+        "total_price",
+        "star_rating",
+        "refundable_tag",
+        "hotel_id",
+        "address",
+        "currency",
+    )
+
+    @classmethod
+    def columns(cls) -> tuple:
+        """Field order used by :meth:`as_tuple` (table display order)."""
+        return cls._COLUMNS
+
+    def as_tuple(self) -> tuple:
+        """Row values in :meth:`columns` order, e.g. for CSV/table export."""
+        return _HOTEL_ROW_GETTER(self)
+
+
+_HOTEL_ROW_GETTER = attrgetter(*HotelOption.columns())
 
 
 # ==========================
@@ -42,17 +119,334 @@ class HotelOption:
 LITEAPI_BASE_URL = "https://api.liteapi.travel/v3.0"
 LITEAPI_URL = f"{LITEAPI_BASE_URL}/hotels/rates"
 LITEAPI_API_KEY = os.environ.get("LITEAPI_KEY")
+# 읽기 전용 (조건부 헤더는 복사본에)
+LITEAPI_HEADERS = {"X-API-Key": LITEAPI_API_KEY or "", "content-type": "application/json"}
+
+# keep-alive 연결 풀 크기
+LITEAPI_POOL_SIZE = int(os.environ.get("LITEAPI_POOL_SIZE", "32"))
+# (connect, read)
+LITEAPI_TIMEOUT = (3.05, 30)
+
+
+def _make_session() -> requests.Session:
+    """Pooled keep-alive session so repeated LiteAPI calls skip the TCP/TLS handshake."""
+    session = requests.Session()
+    # 429/5xx만 재시도 (read 타임아웃은 바로 ReadTimeout)
+    retry = Retry(
+        total=2,
+        connect=1,
+        read=False,
+        backoff_factor=0.3,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset({"GET", "POST"}),
+    )
+    # 풀이 다 차면 새 연결 대신 빈 연결을 기다림
+    adapter = HTTPAdapter(
+        pool_connections=LITEAPI_POOL_SIZE,
+        pool_maxsize=LITEAPI_POOL_SIZE,
+        max_retries=retry,
+        pool_block=True,
+    )
+    session.mount("https://", adapter)
+    session.headers.update(
+        {
+            "accept": "application/json",
+            "content-type": "application/json",
+        }
+    )
+    return session
 
 
-def parse_price_to_float(price) -> float:
-    """Convert fast_flights price (string/number) to float."""
-    if price is None:
-        return float("inf")
-    if isinstance(price, (int, float)):
-        return float(price)
+# app.py와 공유
+LITEAPI_SESSION = _make_session()
+
+
+# ==========================
+#  Outgoing rate limit
+# ==========================
+
+# 초당 호출 상한 (LiteAPI 테스트 키 10 TPS, 0 이하면 제한 없음)
+LITEAPI_RATE_PER_SEC = float(os.environ.get("LITEAPI_RATE_PER_SEC", "10"))
+FLIGHT_RATE_PER_SEC = float(os.environ.get("FLIGHT_RATE_PER_SEC", "10"))
+# 재시도까지 실패하면 모든 호출을 이만큼 늦춤
+LITEAPI_BACKOFF_SECONDS = 2.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``acquire()`` blocks until one call may go out."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            # 미리 차감(음수 허용)하고 sleep은 락 밖에서
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back for about ``seconds`` (e.g. after upstream rate-limit errors)."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            # 먼저 채우고 기준 시각을 지금으로 (안 하면 다음 acquire가 pause를 상쇄)
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+LITEAPI_BUCKET = TokenBucket(LITEAPI_RATE_PER_SEC)
+FLIGHT_BUCKET = TokenBucket(FLIGHT_RATE_PER_SEC)
+
+
+# ==========================
+#  Search result cache
+# ==========================
+
+# 같은 조건 재조회는 15분 캐시
+CACHE_TTL_SECONDS = 900
+
+# 선택: SQLite 2차 캐시
+SEARCH_CACHE_DB = os.environ.get("SEARCH_CACHE_DB")
+# 선택: SQLite 대신 Redis 2차 캐시 (redis 패키지 필요)
+REDIS_URL = os.environ.get("REDIS_URL")
+# ETag/Last-Modified + 마지막 결과
+VALIDATOR_TTL_SECONDS = 6 * 3600
+# 장애 시 대신 보여줄 저장본의 최대 나이
+STALE_MAX_AGE_SECONDS = 3600
+# 빈 결과는 짧게만
+NEGATIVE_TTL_SECONDS = 300
+DISK_CACHE_TTL_SECONDS = {
+    "flights": 6 * 3600,
+    "hotels": 6 * 3600,
+    "hotel_misses": NEGATIVE_TTL_SECONDS,
+    "hotel_validators": 24 * 3600,
+}
+
+_FLIGHT_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=CACHE_TTL_SECONDS)
+_HOTEL_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=CACHE_TTL_SECONDS)
+_HOTEL_MISSES: TTLCache = TTLCache(maxsize=4096, ttl=NEGATIVE_TTL_SECONDS)
+_HOTEL_VALIDATORS: TTLCache = TTLCache(maxsize=4096, ttl=VALIDATOR_TTL_SECONDS)
+_MEMORY_CACHES = {
+    "flights": _FLIGHT_CACHE,
+    "hotels": _HOTEL_CACHE,
+    "hotel_misses": _HOTEL_MISSES,
+    "hotel_validators": _HOTEL_VALIDATORS,
+}
+_CACHE_LOCK = threading.Lock()
+
+
+def _flight_to_json(option: FlightOption) -> list:
+    return [
+        option.depart_date.isoformat(),
+        option.return_date.isoformat() if option.return_date else None,
+        option.price_value,
+        option.price_raw,
+        option.airline,
+    ]
+
+
+def _flight_from_json(v: list) -> FlightOption:
+    return FlightOption(
+        depart_date=date.fromisoformat(v[0]),
+        return_date=date.fromisoformat(v[1]) if v[1] else None,
+        price_value=v[2],
+        price_raw=v[3],
+        airline=v[4],
+    )
+
+
+def _hotels_to_json(rows: List[HotelOption]) -> list:
+    return [r.as_tuple() for r in rows]
+
+
+def _hotels_from_json(v: list) -> List[HotelOption]:
+    columns = HotelOption.columns()
+    return [HotelOption(**dict(zip(columns, r))) for r in v]
+
+
+# 2차 캐시는 pickle 대신 JSON
+_DISK_CODECS = {
+    "flights": (_flight_to_json, _flight_from_json),
+    "hotels": (_hotels_to_json, _hotels_from_json),
+    "hotel_misses": (bool, bool),
+    "hotel_validators": (
+        lambda v: [v[0], v[1], _hotels_to_json(v[2]), v[3]],
+        lambda v: (v[0], v[1], _hotels_from_json(v[2]), v[3]),
+    ),
+}
+
+
+class _DiskCache:
+    """SQLite-backed second-level cache that survives worker restarts.
+
+    Values are JSON blobs (see ``_DISK_CODECS``). Any SQLite error is
+    treated as a miss so a locked or broken cache file never fails a search.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        conn = sqlite3.connect(path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " bucket TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+                " expires_at REAL NOT NULL, PRIMARY KEY (bucket, key))"
+            )
+            conn.execute("DELETE FROM search_cache WHERE expires_at < ?", (time.time(),))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 연결은 스레드마다 하나
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, bucket: str, key: tuple):
+        try:
+            row = self._conn().execute(
+                "SELECT value, expires_at FROM search_cache WHERE bucket = ? AND key = ?",
+                (bucket, repr(key)),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def put(self, bucket: str, key: tuple, blob: bytes, ttl: float) -> None:
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO search_cache (bucket, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (bucket, repr(key), blob, time.time() + ttl),
+            )
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> None:
+        try:
+            self._conn().execute("DELETE FROM search_cache")
+        except sqlite3.Error:
+            pass
+
+
+class _RedisCache:
+    """Redis-backed second-level cache shared by every worker and instance.
+
+    Same interface and JSON blobs as ``_DiskCache``; expiry is left to
+    Redis. Any Redis error is treated as a miss so an unreachable server
+    only costs a short socket timeout, never a failed search.
+    """
+
+    KEY_PREFIX = "flight_hotels:"
+
+    def __init__(self, url: str):
+        import redis
+
+        self._errors = (redis.exceptions.RedisError, OSError)
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def _key(self, bucket: str, key: tuple) -> str:
+        return f"{self.KEY_PREFIX}{bucket}:{key!r}"
+
+    def get(self, bucket: str, key: tuple):
+        try:
+            return self._client.get(self._key(bucket, key))
+        except self._errors:
+            return None
+
+    def put(self, bucket: str, key: tuple, blob: bytes, ttl: float) -> None:
+        try:
+            self._client.set(self._key(bucket, key), blob, ex=int(ttl))
+        except self._errors:
+            pass
+
+    def clear(self) -> None:
+        try:
+            keys = list(self._client.scan_iter(match=self.KEY_PREFIX + "*", count=500))
+            if keys:
+                self._client.delete(*keys)
+        except self._errors:
+            pass
+
+
+def _make_disk_cache():
+    if REDIS_URL:
+        try:
+            return _RedisCache(REDIS_URL)
+        except (ImportError, ValueError):
+            pass  # redis 미설치/잘못된 URL -> SQLite로
+    if SEARCH_CACHE_DB:
+        try:
+            return _DiskCache(SEARCH_CACHE_DB)
+        except (sqlite3.Error, OSError):
+            return None
+    return None
+
+
+_DISK_CACHE: Optional[_DiskCache | _RedisCache] = _make_disk_cache()
+
+
+def _cache_get(bucket: str, key: tuple):
+    memory = _MEMORY_CACHES[bucket]
+    with _CACHE_LOCK:
+        value = memory.get(key)
+    if value is not None or _DISK_CACHE is None:
+        return value
+
+    blob = _DISK_CACHE.get(bucket, key)
+    if blob is None:
+        return None
+    try:
+        value = _DISK_CODECS[bucket][1](json_loads(blob))
+    except Exception:
+        return None
+    with _CACHE_LOCK:
+        memory[key] = value
+    return value
+
+
+def _cache_put(bucket: str, key: tuple, value) -> None:
+    with _CACHE_LOCK:
+        _MEMORY_CACHES[bucket][key] = value
+    if _DISK_CACHE is not None:
+        blob = json_dumps(_DISK_CODECS[bucket][0](value))
+        _DISK_CACHE.put(bucket, key, blob, DISK_CACHE_TTL_SECONDS[bucket])
+
+
+def clear_caches() -> None:
+    """Drop every cached flight/hotel search result (memory and disk)."""
+    with _CACHE_LOCK:
+        for cache in _MEMORY_CACHES.values():
+            cache.clear()
+    if _DISK_CACHE is not None:
+        _DISK_CACHE.clear()
+
 
-    s = str(price)
-    digits = "".join(ch for ch in s if ch.isdigit() or ch == ".")
+_PRICE_RE = re.compile(r"[^0-9.]")
+
+
+@lru_cache(maxsize=4096)
+def _parse_price_str(s: str) -> float:
+    digits = _PRICE_RE.sub("", s)
     if not digits:
         return float("inf")
     try:
@@ -61,10 +455,80 @@ def parse_price_to_float(price) -> float:
         return float("inf")
 
 
+def parse_price_to_float(price) -> float:
+    """Convert fast_flights price (string/number) to float."""
+    if price is None:
+        return float("inf")
+    if isinstance(price, (int, float)):
+        return float(price)
+    return _parse_price_str(str(price))
+
+
+@lru_cache(maxsize=128)
+def month_dates(year: int, month: int) -> tuple:
+    """All dates of the given month, in order (cached per year/month)."""
+    first = date(year, month, 1)
+    return tuple(first + timedelta(days=i) for i in range(monthrange(year, month)[1]))
+
+
 # ==========================
 #  Flights (fast_flights)
 # ==========================
 
+# 한달 스캔 동시 조회 날짜 수
+FLIGHT_SCAN_WORKERS = int(os.environ.get("FLIGHT_SCAN_WORKERS", "16"))
+
+_BY_PRICE_THEN_DATE = attrgetter("price_value", "depart_date")
+
+# 보통 저렴한 출발 요일: 화(1), 수(2), 토(5)
+_CHEAP_WEEKDAYS = (1, 2, 5)
+
+# fallback 모드는 Google 직접 조회가 막히면 playwright 우회 서버를 한 번 더 부름.
+# 우회 서버까지 실패하면 잠시 common만 사용
+FF_FALLBACK_COOLDOWN_SECONDS = 60
+_ff_fallback_broken_until = 0.0
+
+
+@lru_cache(maxsize=None)
+def load_fast_flights():
+    """Import fast_flights on first use; hotel-only workers never pay for it (primp/selectolax/protobuf)."""
+    import fast_flights
+
+    return fast_flights
+
+
+# gunicorn --preload 등에서 미리 import
+if os.environ.get("PRELOAD_FAST_FLIGHTS") == "1":
+    try:
+        load_fast_flights()
+    except ImportError:
+        pass  # 미설치면 실제 항공 조회 시점에 에러
+
+
+def _make_passengers(adults: int) -> Passengers:
+    return load_fast_flights().Passengers(
+        adults=adults,
+        children=0,
+        infants_in_seat=0,
+        infants_on_lap=0,
+    )
+
+
+def fetch_flights(**kwargs) -> Result:
+    """``get_flights`` with ``fetch_mode="fallback"``, skipping the fallback while it is known broken."""
+    global _ff_fallback_broken_until
+
+    get_flights = load_fast_flights().get_flights
+    FLIGHT_BUCKET.acquire()
+    if time.monotonic() < _ff_fallback_broken_until:
+        return get_flights(fetch_mode="common", **kwargs)
+    try:
+        return get_flights(fetch_mode="fallback", **kwargs)
+    except AssertionError:
+        # fallback에서 나오는 AssertionError = 우회 서버 실패
+        _ff_fallback_broken_until = time.monotonic() + FF_FALLBACK_COOLDOWN_SECONDS
+        raise
+
 
 def search_flights_for_date(
     depart: date,
@@ -74,12 +538,23 @@ def search_flights_for_date(
     return_date: Optional[date] = None,
     adults: int = 1,
     seat: str = "economy",
+    passengers: Optional[Passengers] = None,
 ) -> Optional[FlightOption]:
-    """Return the cheapest flight for the given date(s) using fast_flights."""
+    """Return the cheapest flight for the given date(s) using fast_flights.
+
+    ``passengers`` lets a sweep pass one prebuilt ``Passengers`` for all days;
+    it must describe ``adults`` adults.
+    """
 
     date_str = depart.isoformat()
     return_date_str = return_date.isoformat() if return_date else None
 
+    cache_key = (date_str, return_date_str, origin, dest, trip, adults, seat)
+    cached = _cache_get("flights", cache_key)
+    if cached is not None:
+        return cached
+
+    FlightData = load_fast_flights().FlightData
     if trip == "round-trip" and return_date_str:
         flight_data = [
             FlightData(date=date_str, from_airport=origin, to_airport=dest),
@@ -88,21 +563,15 @@ def search_flights_for_date(
     else:
         flight_data = [FlightData(date=date_str, from_airport=origin, to_airport=dest)]
 
-    passengers = Passengers(
-        adults=adults,
-        children=0,
-        infants_in_seat=0,
-        infants_on_lap=0,
-    )
+    if passengers is None:
+        passengers = _make_passengers(adults)
 
     try:
-        result: Result = get_flights(
+        result: Result = fetch_flights(
             flight_data=flight_data,
             trip="round-trip" if trip == "round-trip" else "one-way",
             seat=seat,
             passengers=passengers,
-            fetch_mode="fallback",
-            
         )
     except Exception:
         return None
@@ -115,13 +584,15 @@ def search_flights_for_date(
     price_raw = getattr(cheapest, "price", "")
     airline = getattr(cheapest, "name", "") or getattr(cheapest, "airline", "")
 
-    return FlightOption(
+    option = FlightOption(
         depart_date=depart,
         return_date=return_date,
         price_value=parse_price_to_float(price_raw),
         price_raw=str(price_raw),
         airline=airline or "N/A",
     )
+    _cache_put("flights", cache_key, option)
+    return option
 
 
 def find_cheapest_flight_in_month(
@@ -133,17 +604,28 @@ def find_cheapest_flight_in_month(
     stay_nights: int,
     adults: int,
     seat: str,
+    min_acceptable_price: Optional[float] = None,
 ) -> Optional[FlightOption]:
-    """Find the cheapest option within the month for the given route."""
+    """Find the cheapest option within the month for the given route.
+
+    fast_flights is blocking, so every day of the month is looked up
+    concurrently on a thread pool instead of one after another. Days that
+    are usually cheap (Tue/Wed/Sat departures) are submitted first; with
+    ``min_acceptable_price`` the scan returns the first option at or below
+    that price and cancels the lookups that have not started yet.
+    """
 
-    days_in_month = monthrange(year, month)[1]
-    best: Optional[FlightOption] = None
+    dates = month_dates(year, month)
+    passengers = _make_passengers(adults)
 
-    for day in range(1, days_in_month + 1):
-        depart = date(year, month, day)
-        return_d = depart + timedelta(days=stay_nights) if trip == "round-trip" else None
+    _stay = timedelta(days=stay_nights)
+    _search = search_flights_for_date
+    round_trip = trip == "round-trip"
 
-        option = search_flights_for_date(
+    def _search_day(depart: date) -> Optional[FlightOption]:
+        return_d = depart + _stay if round_trip else None
+
+        return _search(
             depart=depart,
             origin=origin,
             dest=dest,
@@ -151,14 +633,31 @@ def find_cheapest_flight_in_month(
             return_date=return_d,
             adults=adults,
             seat=seat,
+            passengers=passengers,
         )
-        if option is None:
-            continue
 
-        if best is None or option.price_value < best.price_value:
-            best = option
+    days = sorted(dates, key=lambda d: d.weekday() not in _CHEAP_WEEKDAYS)
 
-    return best
+    options: List[FlightOption] = []
+    executor = ThreadPoolExecutor(max_workers=min(FLIGHT_SCAN_WORKERS, len(dates)))
+    try:
+        futures = [executor.submit(_search_day, d) for d in days]
+        for fut in as_completed(futures):
+            option = fut.result()
+            if option is None:
+                continue
+            if min_acceptable_price is not None and option.price_value <= min_acceptable_price:
+                return option
+            options.append(option)
+    finally:
+        # 조기 종료 시 대기 중인 날짜는 취소
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if not options:
+        return None
+
+    # 같은 가격이면 이른 날짜 우선
+    return min(options, key=_BY_PRICE_THEN_DATE)
 
 
 # ==========================
@@ -166,6 +665,132 @@ def find_cheapest_flight_in_month(
 # ==========================
 
 
+_BY_TOTAL_PRICE = attrgetter("total_price")
+
+
+def _iter_hotel_options(
+    hotels_raw: List[dict],
+    hotel_meta_map: dict,
+    currency: str,
+) -> Iterator[HotelOption]:
+    """Yield one unranked HotelOption per priced hotel of a rates response."""
+    _HotelOption = HotelOption
+    _float = float
+    _inf = float("inf")
+    _meta_get = hotel_meta_map.get
+
+    for hotel_obj in hotels_raw:
+        hotel_id = hotel_obj.get("hotelId") or ""
+
+        hotel_info = hotel_obj.get("hotel") or _meta_get(hotel_id) or {}
+
+        name = hotel_info.get("name") or hotel_info.get("hotelName") or hotel_obj.get("hotelName") or ""
+
+        star = hotel_info.get("starRating")
+        if star is None:
+            star = hotel_info.get("rating")
+
+        addr = hotel_info.get("address")
+        try:
+            address = addr.get("line1") or addr.get("city") or ""
+        except AttributeError:
+            address = addr if isinstance(addr, str) else ""
+
+        room_types = hotel_obj.get("roomTypes") or []
+        if not room_types:
+            continue
+
+        best_amount = _inf
+        best_room = None
+        best_offer = None
+        for rt in room_types:
+            offer = rt.get("offerRetailRate") or {}
+            amt = offer.get("amount")
+            # 문자열 금액만 변환, 숫자가 아니면 건너뜀
+            if not isinstance(amt, (int, float)):
+                try:
+                    amt = _float(amt)
+                except (TypeError, ValueError):
+                    continue
+            if amt < best_amount:
+                best_amount, best_room, best_offer = amt, rt, offer
+        if best_room is None:
+            continue
+
+        total_price = best_amount
+        curr = best_offer.get("currency", currency)
+
+        first_rate = (best_room.get("rates") or [{}])[0]
+        refundable_tag = (first_rate.get("cancellationPolicies") or {}).get("refundableTag", "")
+
+        yield _HotelOption(
+            rank=0,
+            hotel_id=hotel_id,
+            name=name,
+            star_rating=star,
+            address=address,
+            total_price=_float(total_price),
+            currency=curr,
+            refundable_tag=refundable_tag,
+        )
+
+
+@lru_cache(maxsize=256)
+def _build_hotel_payload_template(
+    city_name: str,
+    country_code: str,
+    min_star: int,
+    max_star: int,
+    currency: str,
+    nationality: str,
+    adults: int,
+    limit: int,
+) -> bytes:
+    """Serialized LiteAPI rates payload without the stay dates.
+
+    Everything except checkin/checkout is the same for every call of a
+    month sweep, so it is encoded once and the dates are spliced in.
+    """
+    payload = {
+        "occupancies": [{"adults": adults}],  # ✅ 고정 2 -> 입력값
+        "sort": [{"field": "price", "direction": "ascending"}],
+        "starRating": list(range(min_star, max_star + 1)),
+        "currency": currency,
+        "guestNationality": nationality,
+        "maxRatesPerHotel": 1,
+        "boardType": "RO",
+        "refundableRatesOnly": False,
+        "cityName": city_name,
+        "countryCode": country_code,
+        "includeHotelData": True,
+        "limit": limit,
+    }
+    return json_dumps(payload)
+
+
+def _hotel_payload_body(template: bytes, checkin: date, checkout: date) -> bytes:
+    # 마지막 "}" 앞에 날짜만 붙임
+    return template[:-1] + b',"checkin":"%s","checkout":"%s"}' % (
+        checkin.isoformat().encode("ascii"),
+        checkout.isoformat().encode("ascii"),
+    )
+
+
+def _cache_hotel_rows(cache_key: tuple, rows: list) -> None:
+    # 빈 결과는 짧은 부정 캐시로
+    if rows:
+        _cache_put("hotels", cache_key, rows)
+    else:
+        _cache_put("hotel_misses", cache_key, True)
+
+
+def _stale_hotel_rows(validators) -> List[HotelOption]:
+    # 1시간 이내 저장본만, stale 표시한 복사본으로
+    if validators is None or len(validators) < 4 or time.time() - validators[3] > STALE_MAX_AGE_SECONDS:
+        return []
+    return [replace(r, stale=True) for r in validators[2]]
+
+
 def search_hotels_for_dates(
     checkin: date,
     checkout: date,
@@ -178,8 +803,12 @@ def search_hotels_for_dates(
     nationality: str = "KR",
     adults: int = 2,   # ✅ 추가: 성인 수 반영
     session: Optional[requests.Session] = None,
+    top_k: Optional[int] = None,
 ) -> List[HotelOption]:
-    """Fetch hotels from LiteAPI and return them sorted by price."""
+    """Fetch hotels from LiteAPI and return them sorted by price.
+
+    With ``top_k`` only the cheapest ``top_k`` hotels are kept (and ranked).
+    """
 
     if not LITEAPI_API_KEY:
         raise RuntimeError("LITEAPI_KEY 환경변수가 설정되지 않았습니다.")
@@ -187,37 +816,63 @@ def search_hotels_for_dates(
     if min_star > max_star:
         min_star, max_star = max_star, min_star
 
-    payload = {
-        "occupancies": [{"adults": int(adults)}],  # ✅ 고정 2 -> 입력값
-        "sort": [{"field": "price", "direction": "ascending"}],
-        "starRating": list(range(int(min_star), int(max_star) + 1)),
-        "currency": currency,
-        "guestNationality": nationality,
-        "checkin": checkin.isoformat(),
-        "checkout": checkout.isoformat(),
-        "maxRatesPerHotel": 1,
-        "boardType": "RO",
-        "refundableRatesOnly": False,
-        "cityName": city_name,
-        "countryCode": country_code,
-        "includeHotelData": True,
-        "limit": int(limit),
-    }
+    cache_key = (
+        checkin.isoformat(),
+        checkout.isoformat(),
+        city_name,
+        country_code,
+        int(min_star),
+        int(max_star),
+        int(limit),
+        currency,
+        nationality,
+        int(adults),
+        top_k,
+    )
+    cached = _cache_get("hotels", cache_key)
+    if cached is not None:
+        return list(cached)
+    if _cache_get("hotel_misses", cache_key) is not None:
+        return []
 
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "X-API-Key": LITEAPI_API_KEY,
-    }
+    template = _build_hotel_payload_template(
+        city_name, country_code, int(min_star), int(max_star), currency, nationality, int(adults), int(limit)
+    )
+    body = _hotel_payload_body(template, checkin, checkout)
+
+    headers = LITEAPI_HEADERS
+
+    # 만료돼도 ETag/Last-Modified가 있으면 조건부 요청
+    validators = _cache_get("hotel_validators", cache_key)
+    if validators is not None and (validators[0] or validators[1]):
+        etag, last_modified = validators[0], validators[1]
+        headers = dict(LITEAPI_HEADERS)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
 
     try:
-        # connect 10초, read 60초
-        client = session or requests
-        resp = client.post(LITEAPI_URL, json=payload, headers=headers, timeout=(10, 60))
-        resp.raise_for_status()
-        data = resp.json()
-    except requests.exceptions.Timeout:
-        return []
+        client = session or LITEAPI_SESSION
+        LITEAPI_BUCKET.acquire()
+        resp = client.post(LITEAPI_URL, data=body, headers=headers, timeout=LITEAPI_TIMEOUT)
+        status = resp.status_code
+        if status == 429 or status >= 500:
+            return _stale_hotel_rows(validators)
+        if status >= 400:
+            return []
+        if status == 304 and validators is not None:
+            rows = validators[2]
+            _cache_hotel_rows(cache_key, rows)
+            _cache_put("hotel_validators", cache_key, (validators[0], validators[1], rows, time.time()))
+            return list(rows)
+        data = json_loads(resp.content)
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+        return _stale_hotel_rows(validators)
+    except requests.exceptions.RetryError:
+        # 재시도 소진 -> 다른 날짜 조회도 잠시 쉼
+        LITEAPI_BUCKET.pause(LITEAPI_BACKOFF_SECONDS)
+        return _stale_hotel_rows(validators)
     except requests.exceptions.RequestException:
         return []
     except ValueError:
@@ -228,69 +883,19 @@ def search_hotels_for_dates(
 
     # 호텔 메타 보강
     hotels_meta = data.get("hotels") or []
-    hotel_meta_map = {h.get("id"): h for h in hotels_meta if h.get("id")}
-
-    rows: List[HotelOption] = []
-
-    for hotel_obj in hotels_raw:
-        hotel_id = hotel_obj.get("hotelId") or ""
-
-        hotel_info = hotel_obj.get("hotel") or {}
-        if (not hotel_info) and hotel_id in hotel_meta_map:
-            hotel_info = hotel_meta_map[hotel_id] or {}
+    hotel_meta_map = {hid: h for h in hotels_meta if (hid := h.get("id"))}
 
-        name = (
-            hotel_info.get("name")
-            or hotel_info.get("hotelName")
-            or hotel_obj.get("hotelName")
-            or ""
-        )
-
-        star = hotel_info.get("starRating")
-        if star is None:
-            star = hotel_info.get("rating")
-
-        address = ""
-        addr = hotel_info.get("address")
-        if isinstance(addr, dict):
-            address = addr.get("line1") or addr.get("city") or ""
-        elif isinstance(addr, str):
-            address = addr
-
-        room_types = hotel_obj.get("roomTypes") or []
-        if not room_types:
-            continue
-
-        def get_offer_amount(rt: dict) -> float:
-            offer = rt.get("offerRetailRate") or {}
-            return offer.get("amount", float("inf"))
-
-        best_room = min(room_types, key=get_offer_amount)
-        offer = best_room.get("offerRetailRate") or {}
-        total_price = offer.get("amount")
-        curr = offer.get("currency", currency)
-
-        first_rate = (best_room.get("rates") or [{}])[0]
-        refundable_tag = (first_rate.get("cancellationPolicies") or {}).get("refundableTag", "")
-
-        if total_price is None:
-            continue
-
-        rows.append(
-            HotelOption(
-                rank=0,
-                hotel_id=hotel_id,
-                name=name,
-                star_rating=star,
-                address=address,
-                total_price=float(total_price),
-                currency=curr,
-                refundable_tag=refundable_tag,
-            )
-        )
-
-    rows.sort(key=lambda x: x.total_price)
+    options = _iter_hotel_options(hotels_raw, hotel_meta_map, currency)
+    if top_k is not None:
+        # top_k개짜리 힙만 유지
+        rows = heapq.nsmallest(top_k, options, key=_BY_TOTAL_PRICE)
+    else:
+        rows = sorted(options, key=_BY_TOTAL_PRICE)
     for i, r in enumerate(rows, start=1):
         r.rank = i
 
-    return rows
+    _cache_hotel_rows(cache_key, rows)
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    _cache_put("hotel_validators", cache_key, (etag, last_modified, rows, time.time()))
+    return list(rows)
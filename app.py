@@ -1,17 +1,61 @@
 from __future__ import annotations
 
+import heapq
 import os
-import calendar
-from datetime import date, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timedelta
+from functools import lru_cache, wraps
+from operator import attrgetter, itemgetter
 from typing import Dict, List, Optional
-from types import SimpleNamespace
+from types import MappingProxyType, SimpleNamespace
+from zoneinfo import ZoneInfo
 
 import requests
-from flask import Flask, abort, request, render_template
-
-from Hotel_flight import find_cheapest_flight_in_month, search_hotels_for_dates
+from cachetools import TTLCache
+from flask import Flask, abort, request, render_template, stream_template
+from jinja2 import FileSystemBytecodeCache
+
+from Hotel_flight import clear_caches as clear_search_caches
+from Hotel_flight import (
+    LITEAPI_BACKOFF_SECONDS,
+    LITEAPI_BUCKET,
+    LITEAPI_HEADERS,
+    LITEAPI_SESSION,
+    LITEAPI_TIMEOUT,
+    fetch_flights,
+    find_cheapest_flight_in_month,
+    json_dumps,
+    json_loads,
+    load_fast_flights,
+    month_dates,
+    parse_price_to_float,
+    search_hotels_for_dates,
+)
 
 app = Flask(__name__)
+# 컴파일된 템플릿 디스크 캐시 (워커 재시작 시 재컴파일 생략)
+app.jinja_options = {
+    **app.jinja_options,
+    "bytecode_cache": FileSystemBytecodeCache(os.environ.get("JINJA_CACHE_DIR") or None),
+}
+
+
+@lru_cache(maxsize=None)
+def _compiled_template(name: str):
+    return app.jinja_env.get_template(name)
+
+
+def _page(name: str):
+    """Template to pass to render_template: the precompiled object unless auto-reload (debug) is on."""
+    return name if app.jinja_env.auto_reload else _compiled_template(name)
+
+
+# 페이지 템플릿은 import 때 미리 컴파일
+for _template_name in ("base.html", "index.html", "travel.html"):
+    _compiled_template(_template_name)
+
 
 # --- Secrets / config via environment variables ---
 LITEAPI_API_KEY = os.environ.get("LITEAPI_KEY")
@@ -20,29 +64,55 @@ ACCESS_KEY = os.environ.get("ACCESS_KEY")  # optional: simple shared secret for
 LITEAPI_URL = "https://api.liteapi.travel/v3.0/hotels/rates"
 USD_TO_KRW = 1480  # 대충 환산(원하면 나중에 환율 API로 바꾸면 됨)
 
+# 사용자 기준 "오늘"은 KST (Render 서버는 UTC)
+_KST = ZoneInfo("Asia/Seoul")
+
+
+def _today() -> date:
+    return datetime.now(_KST).date()
+
+if not LITEAPI_API_KEY:
+    app.logger.warning("LITEAPI_KEY is not set; hotel searches will fail until it is configured.")
+
+# 호텔 한달 스캔 동시 조회 수
+HOTEL_SCAN_WORKERS = int(os.environ.get("HOTEL_SCAN_WORKERS", "8"))
+# 모든 요청 합계 LiteAPI 동시 호출 상한
+_LITEAPI_SLOTS = threading.Semaphore(int(os.environ.get("LITEAPI_MAX_CONCURRENCY", "10")))
+
+# 같은 rates 조회는 10분간 재사용 (2xx만)
+_RATES_CACHE: TTLCache = TTLCache(maxsize=2048, ttl=600)
+_RATES_CACHE_LOCK = threading.Lock()
+# 같은 항공 조회는 60초만 재사용
+_FLIGHT_CACHE: TTLCache = TTLCache(maxsize=512, ttl=60)
+_FLIGHT_CACHE_LOCK = threading.Lock()
+# 호텔 한달 스캔 결과 5분 재사용 (top_n만 바꾼 재전송 등)
+_MONTH_SCAN_CACHE: TTLCache = TTLCache(maxsize=64, ttl=300)
+_MONTH_SCAN_CACHE_LOCK = threading.Lock()
+
+# 항공/호텔 동시 조회용 공용 풀
+_REQUEST_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="travel")
+_FETCH_WAIT_SECONDS = 130
+
 
 # -----------------------------
 # Access gate (travel only)
 # -----------------------------
-def _require_access_key_for_travel():
-    """ACCESS_KEY가 설정돼 있으면 /travel 접근을 key로 제한."""
-    if not ACCESS_KEY:
-        return
-    if request.endpoint != "travel":
-        return
-
-    provided = (
-        request.args.get("key")
-        or request.form.get("key")
-        or request.headers.get("X-Access-Key")
-    )
-    if provided != ACCESS_KEY:
-        abort(403)
-
+def require_key(view):
+    """ACCESS_KEY가 설정돼 있으면 이 view 접근을 key로 제한 (다른 경로/정적 파일은 검사 안 함)."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if ACCESS_KEY:
+            provided = (
+                request.args.get("key")
+                or request.form.get("key")
+                or request.headers.get("X-Access-Key")
+            )
+            if provided != ACCESS_KEY:
+                abort(403)
+        return view(*args, **kwargs)
 
-@app.before_request
-def _gatekeeper():
-    _require_access_key_for_travel()
+    return wrapper
 
 
 # -----------------------------
@@ -50,7 +120,7 @@ def _gatekeeper():
 # -----------------------------
 @app.get("/")
 def home():
-    return render_template("index.html", title="소개")
+    return render_template(_page("index.html"), title="소개")
 
 @app.get("/healthz")
 def healthz():
@@ -59,18 +129,84 @@ def healthz():
 # -----------------------------
 # LiteAPI helpers (hotel period/month)
 # -----------------------------
-def fetch_rates(payload: dict) -> dict:
+def _require_liteapi_key() -> None:
     if not LITEAPI_API_KEY:
         raise RuntimeError("LITEAPI_KEY 환경변수가 설정되지 않았습니다.")
 
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "X-API-Key": LITEAPI_API_KEY,
-    }
-    resp = requests.post(LITEAPI_URL, json=payload, headers=headers, timeout=120)
+
+def fetch_rates(payload: dict) -> dict:
+    """POST a rates query to LiteAPI; identical payloads are served from a 10-minute cache."""
+    # 직렬화한 body가 곧 캐시 키
+    body = json_dumps(payload)
+    with _RATES_CACHE_LOCK:
+        cached = _RATES_CACHE.get(body)
+    if cached is not None:
+        return cached
+
+    LITEAPI_BUCKET.acquire()
+    try:
+        resp = LITEAPI_SESSION.post(
+            LITEAPI_URL,
+            data=body,
+            headers=LITEAPI_HEADERS,
+            timeout=LITEAPI_TIMEOUT,
+        )
+    except requests.exceptions.RetryError:
+        # 재시도 소진 -> 다른 요청의 호출도 잠시 늦춤
+        LITEAPI_BUCKET.pause(LITEAPI_BACKOFF_SECONDS)
+        raise
     resp.raise_for_status()
-    return resp.json()
+    data = json_loads(resp.content)
+
+    with _RATES_CACHE_LOCK:
+        _RATES_CACHE[body] = data
+    return data
+
+
+def clear_caches() -> None:
+    """Drop the app-level rates/flight caches and Hotel_flight's search caches (for debugging)."""
+    with _RATES_CACHE_LOCK:
+        _RATES_CACHE.clear()
+    with _FLIGHT_CACHE_LOCK:
+        _FLIGHT_CACHE.clear()
+    with _MONTH_SCAN_CACHE_LOCK:
+        _MONTH_SCAN_CACHE.clear()
+    clear_search_caches()
+
+
+@lru_cache(maxsize=64)
+def _star_list(min_stars: int, max_stars: int) -> tuple:
+    return tuple(range(min_stars, max_stars + 1))
+
+
+@lru_cache(maxsize=128)
+def _payload_skeleton(
+    city: str,
+    country: str,
+    min_stars: int,
+    max_stars: int,
+    adults: int,
+    guest_nationality: str,
+    currency: str,
+    limit: int,
+) -> MappingProxyType:
+    return MappingProxyType(
+        {
+            "occupancies": ({"adults": adults},),
+            "sort": ({"field": "price", "direction": "ascending"},),
+            "starRating": _star_list(min_stars, max_stars),
+            "currency": currency,
+            "guestNationality": guest_nationality,
+            "timeout": 6,
+            "maxRatesPerHotel": 1,
+            "boardType": "RO",
+            "refundableRatesOnly": False,
+            "cityName": city,
+            "countryCode": country,
+            "includeHotelData": True,
+            "limit": limit,
+        }
+    )
 
 
 def build_payload_for_period(
@@ -85,76 +221,108 @@ def build_payload_for_period(
     currency: str,
     limit: int,
 ) -> dict:
-    star_list = list(range(min_stars, max_stars + 1))
-    return {
-        "occupancies": [{"adults": adults}],
-        "sort": [{"field": "price", "direction": "ascending"}],
-        "starRating": star_list,
-        "currency": currency,
-        "guestNationality": guest_nationality,
-        "checkin": checkin.isoformat(),
-        "checkout": checkout.isoformat(),
-        "timeout": 6,
-        "maxRatesPerHotel": 1,
-        "boardType": "RO",
-        "refundableRatesOnly": False,
-        "cityName": city,
-        "countryCode": country,
-        "includeHotelData": True,
-        "limit": limit,
-    }
-
-
-def build_rows_from_rates(resp_json: dict, top_n: int = 10) -> List[Dict]:
+    skeleton = _payload_skeleton(
+        city, country, min_stars, max_stars, adults, guest_nationality, currency, limit
+    )
+    return {**skeleton, "checkin": checkin.isoformat(), "checkout": checkout.isoformat()}
+
+
+def _cheapest_room(room_types: List[Dict]):
+    """한 번 순회로 최저가 (객실, offer)를 같이 잡음. 가격이 전부 없으면 첫 객실."""
+    best_room = room_types[0]
+    # 객실이 하나뿐인 경우가 대부분
+    if len(room_types) == 1:
+        return best_room, best_room.get("offerRetailRate") or {}
+    best_offer = None
+    best_amount = float("inf")
+    for rt in room_types:
+        offer = rt.get("offerRetailRate") or {}
+        amt = offer.get("amount")
+        # 문자열 금액만 변환
+        if not isinstance(amt, (int, float)):
+            try:
+                amt = float(amt)
+            except (TypeError, ValueError):
+                continue
+        if amt < best_amount:
+            best_amount, best_room, best_offer = amt, rt, offer
+    if best_offer is None:
+        best_offer = best_room.get("offerRetailRate") or {}
+    return best_room, best_offer
+
+
+@dataclass(slots=True)
+class HotelRow:
+    """One row of the hotel_period table."""
+
+    no: int
+    name: str
+    hotel_id: str
+    address: str
+    rating: object
+    price: object
+    currency: Optional[str]
+    refundable: str
+
+
+@dataclass(slots=True)
+class DayPrice:
+    """Cheapest hotel for one check-in date of the hotel_month scan."""
+
+    checkin: date
+    checkout: date
+    price: float
+    currency: str
+    hotel_name: str
+    hotel_id: str
+    stale: bool = False
+
+
+def build_rows_from_rates(resp_json: dict, top_n: int = 10) -> List[HotelRow]:
     data = resp_json.get("data", [])
-    hotels_meta = resp_json.get("hotels", [])
-    hotel_meta_map = {h.get("id"): h for h in hotels_meta}
+    if not data:
+        return []
+    top = data[:top_n]
+
+    # 메타는 상위 top_n개 것만
+    needed_ids = {item.get("hotelId") for item in top}
+    needed_ids.discard(None)
+    hotel_meta_map = {
+        h.get("id"): h for h in resp_json.get("hotels", []) if h.get("id") in needed_ids
+    }
 
-    rows: List[Dict] = []
+    rows: List[HotelRow] = []
+    append = rows.append
+    meta_get = hotel_meta_map.get
+    cheapest_room = _cheapest_room
+    no_meta: Dict = {}
+    no = 0
 
-    for idx, item in enumerate(data[:top_n], start=1):
+    for item in top:
         hotel_id = item.get("hotelId")
-        if not hotel_id:
+        room_types = item.get("roomTypes")
+        if not hotel_id or not room_types:
             continue
 
-        meta = hotel_meta_map.get(hotel_id, {})
-        hotel_name = meta.get("name", "")
-        address = meta.get("address", "")
-        rating = meta.get("rating", "")
-
-        room_types = item.get("roomTypes") or []
-        if not room_types:
-            continue
-
-        def get_offer_amount(rt: dict) -> float:
-            offer = rt.get("offerRetailRate") or {}
-            amount = offer.get("amount", None)
-            try:
-                return float(amount)
-            except Exception:
-                return float("inf")
-
-        best_room = min(room_types, key=get_offer_amount)
-        offer = best_room.get("offerRetailRate") or {}
-        total_price = offer.get("amount")
-        curr = offer.get("currency")
-
-        first_rate = (best_room.get("rates") or [{}])[0]
-        refundable_tag = (first_rate.get("cancellationPolicies") or {}).get(
-            "refundableTag", ""
-        )
-
-        rows.append(
-            {
-                "no": idx,
-                "name": hotel_name,
-                "hotel_id": hotel_id,
-                "address": address,
-                "rating": rating,
-                "price": total_price,
-                "currency": curr,
-                "refundable": refundable_tag,
-            }
+        meta = meta_get(hotel_id, no_meta)
+        best_room, best_offer = cheapest_room(room_types)
+
+        rates = best_room.get("rates")
+        policies = (rates[0].get("cancellationPolicies") if rates else None) or no_meta
+        refundable_tag = policies.get("refundableTag", "")
+
+        no += 1
+        append(
+            HotelRow(
+                no=no,
+                name=meta.get("name", ""),
+                hotel_id=hotel_id,
+                address=meta.get("address", ""),
+                rating=meta.get("rating", ""),
+                price=best_offer.get("amount"),
+                currency=best_offer.get("currency"),
+                refundable=refundable_tag,
+            )
         )
 
     return rows
@@ -184,19 +352,24 @@ def get_min_price_for_date_via_helper(
         limit=limit,
         currency=currency,
         nationality=nationality,
+        top_k=1,
     )
     if not hotels:
         return None
 
     best = hotels[0]
-    return {
-        "checkin": checkin,
-        "checkout": checkout,
-        "price": best.total_price,
-        "currency": best.currency,
-        "hotelName": best.name,
-        "hotelId": best.hotel_id,
-    }
+    return DayPrice(
+        checkin=checkin,
+        checkout=checkout,
+        price=best.total_price,
+        currency=best.currency,
+        hotel_name=best.name,
+        hotel_id=best.hotel_id,
+        stale=best.stale,
+    )
+
+
+_DAY_PRICE = attrgetter("price")
 
 
 def find_cheapest_hotel_in_month(
@@ -211,52 +384,146 @@ def find_cheapest_hotel_in_month(
     nationality: str,
     adults: int,
     limit: int,
+    fast_scan: bool = False,
 ):
-    last_day = calendar.monthrange(year, month)[1]
-    daily_results: List[Dict] = []
+    """
+    이번 달 각 체크인 날짜별 최저가 호텔을 찾아 (최저가 1건, 가격순 전체) 반환.
+    LiteAPI rates 조회는 한 번에 체크인/체크아웃 한 쌍만 받음 (flex-date/다중 체크인 없음)
+    -> 날짜별 1회 호출이 최소 단위이고, 대신 동시 실행 + 캐시로 대기 시간을 줄임.
+
+    fast_scan=True: 3일 간격으로 먼저 훑고, 싼 3개 날짜의 ±2일만 추가 조회 (호출 수 약 절반,
+    호텔 가격은 날짜에 따라 완만하게 변한다는 가정. 결과 목록에는 조회한 날짜만 들어감)
+    """
+
+    _require_liteapi_key()
+
+    # 지난 날짜를 건너뛰므로 오늘도 키에 포함
+    today = _today()
+    cache_key = (
+        city,
+        country,
+        year,
+        month,
+        nights,
+        min_stars,
+        max_stars,
+        currency,
+        nationality,
+        adults,
+        limit,
+        fast_scan,
+        today,
+    )
+    with _MONTH_SCAN_CACHE_LOCK:
+        cached = _MONTH_SCAN_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
-    for day in range(1, last_day + 1):
-        checkin = date(year, month, day)
+    def _scan_day(checkin: date) -> Optional[DayPrice]:
         try:
-            result = get_min_price_for_date_via_helper(
-                city=city,
-                country=country,
-                checkin=checkin,
-                nights=nights,
-                min_stars=min_stars,
-                max_stars=max_stars,
-                currency=currency,
-                nationality=nationality,
-                adults=adults,
-                limit=limit,
-            )
+            with _LITEAPI_SLOTS:
+                result = get_min_price_for_date_via_helper(
+                    city=city,
+                    country=country,
+                    checkin=checkin,
+                    nights=nights,
+                    min_stars=min_stars,
+                    max_stars=max_stars,
+                    currency=currency,
+                    nationality=nationality,
+                    adults=adults,
+                    limit=limit,
+                )
         except Exception:
-            continue
+            return None
+
+        if result and result.price is not None:
+            return result
+        return None
+
+    # 이미 지난 체크인 날짜는 조회 생략
+    days = [d for d in month_dates(year, month) if d >= today]
+    if not days:
+        return None, []
 
-        if result and result["price"] is not None:
-            daily_results.append(result)
+    with ThreadPoolExecutor(max_workers=min(HOTEL_SCAN_WORKERS, len(days))) as executor:
+        if not fast_scan:
+            daily_results = [r for r in executor.map(_scan_day, days) if r is not None]
+        else:
+            # 1단계: 3일 간격 샘플
+            sampled = days[::3]
+            daily_results = [r for r in executor.map(_scan_day, sampled) if r is not None]
+
+            # 2단계: 싼 3개 날짜 ±2일 보강
+            winners = heapq.nsmallest(3, daily_results, key=_DAY_PRICE)
+            scanned = set(sampled)
+            day_set = set(days)
+            refine = sorted(
+                {
+                    d
+                    for w in winners
+                    for offset in (-2, -1, 1, 2)
+                    if (d := w.checkin + timedelta(days=offset)) in day_set and d not in scanned
+                }
+            )
+            daily_results += [r for r in executor.map(_scan_day, refine) if r is not None]
 
     if not daily_results:
         return None, []
 
-    daily_results_sorted = sorted(daily_results, key=lambda r: float(r["price"]))
+    daily_results_sorted = sorted(daily_results, key=_DAY_PRICE)
     cheapest = daily_results_sorted[0]
+    # 저장본(stale)이 섞인 스캔은 캐시하지 않음
+    if not any(r.stale for r in daily_results_sorted):
+        with _MONTH_SCAN_CACHE_LOCK:
+            _MONTH_SCAN_CACHE[cache_key] = (cheapest, daily_results_sorted)
     return cheapest, daily_results_sorted
 
 
 # -----------------------------
 # Flight helper (period mode)
 # -----------------------------
+_INF = float("inf")
+
+
 def _parse_price_value(price_raw: str) -> Optional[float]:
     if not price_raw:
         return None
-    cleaned = "".join(ch for ch in str(price_raw) if ch.isdigit() or ch == ".")
-    if not cleaned:
-        return None
+    value = parse_price_to_float(price_raw)
+    return None if value == _INF else value
+
+
+_FLIGHT_PRICE = attrgetter("price")
+_FLIGHT_NAME = attrgetter("name")
+
+
+def _flight_price(f) -> str:
     try:
-        return float(cleaned)
-    except Exception:
-        return None
+        return _FLIGHT_PRICE(f) or ""
+    except AttributeError:
+        return ""
+
+
+def _flight_airline(f) -> str:
+    try:
+        name = _FLIGHT_NAME(f)
+    except AttributeError:
+        name = ""
+    return name or getattr(f, "airline", "") or ""
+
+
+_PAIR_PRICE = itemgetter(0)
+# fast-flights 가격 문자열은 통화 기호가 맨 앞에 옴 ("$123", "US$1,234")
+_USD_PREFIXES = ("$", "US$")
+
+
+def _is_usd_price(price_raw: str) -> bool:
+    return price_raw.lstrip().startswith(_USD_PREFIXES)
+
+
+@lru_cache(maxsize=8)
+def _passengers(adults: int):
+    return load_fast_flights().Passengers(adults=adults)
 
 
 def find_cheapest_flight_for_dates(
@@ -272,89 +539,188 @@ def find_cheapest_flight_for_dates(
     fast_flights로 해당 날짜/노선 최저가 항공 1개 반환.
     (find_cheapest_flight_in_month() 결과처럼 SimpleNamespace로 맞춰줌)
     """
+    # fast_flights는 첫 항공 조회 때 import
     try:
-        from fast_flights import FlightData, Passengers, get_flights  # type: ignore
-    except Exception as e:
+        FlightData = load_fast_flights().FlightData
+    except ImportError as e:
         raise RuntimeError(
             "fast-flights 라이브러리를 불러오지 못했습니다. requirements.txt에 fast-flights가 필요합니다."
         ) from e
 
-    flight_data = [FlightData(date=depart.isoformat(), from_airport=origin, to_airport=dest)]
+    if trip == "round-trip" and not ret:
+        raise ValueError("왕복(trip=round-trip)에는 귀국일(ret)이 필요합니다.")
+
+    cache_key = (depart, ret if trip == "round-trip" else None, origin, dest, trip, adults, seat)
+    with _FLIGHT_CACHE_LOCK:
+        cached = _FLIGHT_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    outbound = FlightData(date=depart.isoformat(), from_airport=origin, to_airport=dest)
     if trip == "round-trip":
-        if not ret:
-            raise ValueError("왕복(trip=round-trip)에는 귀국일(ret)이 필요합니다.")
-        flight_data.append(FlightData(date=ret.isoformat(), from_airport=dest, to_airport=origin))
+        flight_data = [outbound, FlightData(date=ret.isoformat(), from_airport=dest, to_airport=origin)]
+    else:
+        flight_data = [outbound]
 
-    result = get_flights(
+    result = fetch_flights(
         flight_data=flight_data,
         trip=trip,
         seat=seat,
-        passengers=Passengers(adults=adults),
-        fetch_mode="fallback",
+        passengers=_passengers(adults),
     )
 
     flights = getattr(result, "flights", None) or []
     if not flights:
         return None
 
-    def _price_num(f):
-        val = _parse_price_value(getattr(f, "price", "") or "")
-        return val if val is not None else float("inf")
-
-    best = min(flights, key=_price_num)
-    price_raw = getattr(best, "price", "") or ""
-    price_value = _parse_price_value(price_raw)
-    airline = getattr(best, "name", "") or getattr(best, "airline", "") or ""
+    # 가격은 한 번만 파싱 (파싱 불가는 제외, 전부 불가면 첫 항공편)
+    parsed = [(p, f) for f in flights if (p := _parse_price_value(_flight_price(f))) is not None]
+    price_value, best = min(parsed, key=_PAIR_PRICE) if parsed else (None, flights[0])
+    price_raw = _flight_price(best)
+    airline = _flight_airline(best)
 
-    return SimpleNamespace(
+    option = SimpleNamespace(
         depart_date=depart,
         return_date=ret if trip == "round-trip" else None,
         airline=airline,
         price_raw=price_raw,
         price_value=price_value,
-        currency="USD" if "$" in price_raw else "",
+        currency="USD" if _is_usd_price(price_raw) else "",
         _raw_flight=best,
     )
+    with _FLIGHT_CACHE_LOCK:
+        _FLIGHT_CACHE[cache_key] = option
+    return option
 
 
 # -----------------------------
 # Travel page
 # -----------------------------
+def _to_krw(best_flight) -> Optional[int]:
+    """항공 최저가를 원화 정수로 (USD면 USD_TO_KRW로 환산). 값이 없거나 숫자가 아니면 None."""
+    if best_flight is None:
+        return None
+    value = getattr(best_flight, "price_value", None)
+    if not isinstance(value, (int, float)):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+    if value == _INF:
+        return None
+
+    # 센트 정수로 계산 (float 오차 없이 원 단위 버림)
+    cents = round(value * 100)
+    is_usd = getattr(best_flight, "currency", "") == "USD" or _is_usd_price(
+        getattr(best_flight, "price_raw", "") or ""
+    )
+    return cents * USD_TO_KRW // 100 if is_usd else cents // 100
+
+
+# GET일 때의 빈 결과
+_EMPTY_RESULTS = dict(
+    period_rows=(),
+    monthly_results=(),
+    hotel_cheapest=None,
+    best_flight=None,
+    fh_hotels=(),
+    combo_hotel=None,
+    flight_price_krw=None,
+    combined_total=None,
+    stale=False,
+    error=None,
+)
+
+
+@dataclass(slots=True, frozen=True)
+class SearchParams:
+    """/travel form inputs with defaults applied; field names match the template variables."""
+
+    mode: str
+    city: str
+    country: str
+    adults: int
+    min_stars: int
+    max_stars: int
+    currency: str
+    guest_nat: str
+    checkin: str
+    checkout: str
+    top_n: int
+    limit: int
+    year: int
+    month: int
+    nights: int
+    origin: str
+    dest: str
+    trip: str
+    seat: str
+    flight_adults: int
+    fh_top_n: int
+
+    @classmethod
+    def from_form(cls, form, today: date) -> "SearchParams":
+        form_get = form.get
+
+        def _int(name: str, default: int) -> int:
+            value = form_get(name)
+            if not value:
+                return default
+            value = value.strip()
+            if value.isdecimal():
+                return int(value)
+            try:
+                return int(value)
+            except ValueError:
+                return default
+
+        return cls(
+            mode=form_get("mode") or "hotel_period",
+            # 모든 모드가 같은 값을 쓰도록 여기서 정리
+            city=(form_get("city") or "").strip() or "Tokyo",
+            country=(form_get("country") or "").strip().upper() or "JP",
+            adults=_int("adults", 2),
+            min_stars=_int("min_stars", 4),
+            max_stars=_int("max_stars", 5),
+            currency=form_get("currency") or "KRW",
+            guest_nat=form_get("guest_nat") or "KR",
+            checkin=form_get("checkin") or today.isoformat(),
+            checkout=form_get("checkout") or (today + timedelta(days=1)).isoformat(),
+            top_n=_int("top_n", 10),
+            limit=_int("limit", 50),
+            year=_int("year", today.year),
+            month=_int("month", today.month),
+            nights=_int("nights", 3),
+            origin=(form_get("origin") or "ICN").upper(),
+            dest=(form_get("dest") or "NRT").upper(),
+            trip=form_get("trip") or "round-trip",
+            seat=form_get("seat") or "economy",
+            flight_adults=_int("flight_adults", 1),
+            fh_top_n=_int("fh_top_n", 10),
+        )
+
+    def as_context(self) -> dict:
+        return {name: getattr(self, name) for name in _SEARCH_PARAM_NAMES}
+
+
+_SEARCH_PARAM_NAMES = tuple(f.name for f in fields(SearchParams))
+
+
 @app.route("/travel", methods=["GET", "POST"])
+@require_key
 def travel():
-    # 기본값
-    mode = request.form.get("mode") or "hotel_period"
+    params = SearchParams.from_form(request.form, _today())
 
-    city = request.form.get("city") or "Tokyo"
-    country = request.form.get("country") or "JP"
+    ctx = dict(
+        params.as_context(),
+        # access key hint
+        has_access_key=bool(ACCESS_KEY),
+        current_key=request.args.get("key") or request.form.get("key") or "",
+    )
 
-    def _int(name: str, default: int) -> int:
-        try:
-            return int(request.form.get(name, default))
-        except Exception:
-            return default
-
-    adults = _int("adults", 2)
-    min_stars = _int("min_stars", 4)
-    max_stars = _int("max_stars", 5)
-    currency = request.form.get("currency") or "KRW"
-    guest_nat = request.form.get("guest_nat") or "KR"
-
-    checkin_s = request.form.get("checkin") or date.today().isoformat()
-    checkout_s = request.form.get("checkout") or (date.today() + timedelta(days=1)).isoformat()
-    top_n = _int("top_n", 10)
-    limit = _int("limit", 50)
-
-    year = _int("year", date.today().year)
-    month = _int("month", date.today().month)
-    nights = _int("nights", 3)
-
-    origin = (request.form.get("origin") or "ICN").upper()
-    dest = (request.form.get("dest") or "NRT").upper()
-    trip = request.form.get("trip") or "round-trip"
-    seat = request.form.get("seat") or "economy"
-    flight_adults = _int("flight_adults", 1)
-    fh_top_n = _int("fh_top_n", 10)
+    # GET: 폼만
+    if request.method != "POST":
+        return render_template(_page("travel.html"), **ctx, **_EMPTY_RESULTS)
 
     # 결과 변수들
     error = None
@@ -368,85 +734,130 @@ def travel():
     combined_total = None
     flight_price_krw = None
 
-    if request.method == "POST":
-        try:
-            # 날짜 파싱
-            checkin = date.fromisoformat(checkin_s)
-            checkout = date.fromisoformat(checkout_s)
+    try:
+        # 날짜 파싱
+        checkin = date.fromisoformat(params.checkin)
+        checkout = date.fromisoformat(params.checkout)
+
+        if params.mode == "hotel_period":
+            _require_liteapi_key()
+            payload = build_payload_for_period(
+                city=params.city,
+                country=params.country,
+                checkin=checkin,
+                checkout=checkout,
+                min_stars=params.min_stars,
+                max_stars=params.max_stars,
+                adults=params.adults,
+                guest_nationality=params.guest_nat,
+                currency=params.currency,
+                limit=params.limit,
+            )
+            resp_json = fetch_rates(payload)
+            period_rows = build_rows_from_rates(resp_json, top_n=params.top_n)
+
+        elif params.mode == "hotel_month":
+            hotel_cheapest, monthly_results = find_cheapest_hotel_in_month(
+                city=params.city,
+                country=params.country,
+                year=params.year,
+                month=params.month,
+                nights=params.nights,
+                min_stars=params.min_stars,
+                max_stars=params.max_stars,
+                currency=params.currency,
+                nationality=params.guest_nat,
+                limit=params.limit,
+                adults=params.adults,
+            )
 
-            if mode == "hotel_period":
-                payload = build_payload_for_period(
-                    city=city,
-                    country=country,
-                    checkin=checkin,
-                    checkout=checkout,
-                    min_stars=min_stars,
-                    max_stars=max_stars,
-                    adults=adults,
-                    guest_nationality=guest_nat,
-                    currency=currency,
-                    limit=limit,
-                )
-                resp_json = fetch_rates(payload)
-                period_rows = build_rows_from_rates(resp_json, top_n=top_n)
+        elif params.mode == "flight_hotel_period":
+            _require_liteapi_key()
+
+            # 입력한 checkin/checkout을 항공 날짜로 사용
+            depart = checkin
+            ret = checkout if params.trip == "round-trip" else None
+
+            # 항공/호텔 동시 조회
+            flight_future = _REQUEST_EXECUTOR.submit(
+                find_cheapest_flight_for_dates,
+                depart=depart,
+                ret=ret,
+                origin=params.origin,
+                dest=params.dest,
+                trip=params.trip,
+                adults=params.flight_adults,
+                seat=params.seat,
+            )
 
-            elif mode == "hotel_month":
-                hotel_cheapest, monthly_results = find_cheapest_hotel_in_month(
-                    city=city,
-                    country=country,
-                    year=year,
-                    month=month,
-                    nights=nights,
-                    min_stars=min_stars,
-                    max_stars=max_stars,
-                    currency=currency,
-                    nationality=guest_nat,
-                    limit=limit,
-                    adults=adults,
-                )
+            # 호텔은 여행기간 그대로
+            hotels_future = _REQUEST_EXECUTOR.submit(
+                search_hotels_for_dates,
+                checkin=checkin,
+                checkout=checkout,
+                city_name=params.city,
+                country_code=params.country,
+                adults=params.adults,
+                min_star=params.min_stars,
+                max_star=params.max_stars,
+                limit=params.limit,
+                currency=params.currency,
+                nationality=params.guest_nat,
+                top_k=params.fh_top_n,
+            )
 
-            elif mode == "flight_hotel_period":
-                # 입력한 checkin/checkout을 항공 날짜로 사용
-                depart = checkin
-                ret = checkout if trip == "round-trip" else None
-
-                best_flight = find_cheapest_flight_for_dates(
-                    depart=depart,
-                    ret=ret,
-                    origin=origin,
-                    dest=dest,
-                    trip=trip,
-                    adults=flight_adults,
-                    seat=seat,
-                )
+            # 한쪽이 실패해도 다른 쪽 결과는 표시
+            try:
+                best_flight = flight_future.result(timeout=_FETCH_WAIT_SECONDS)
+            except Exception as e:
+                best_flight = None
+                error = f"항공 조회 실패 - {type(e).__name__}: {e}"
+            fh_hotels = hotels_future.result(timeout=_FETCH_WAIT_SECONDS) or []
+
+            flight_price_krw = _to_krw(best_flight)
+
+            if fh_hotels:
+                combo_hotel = fh_hotels[0]
+                if flight_price_krw is not None:
+                    try:
+                        combined_total = int(flight_price_krw) + int(combo_hotel.total_price)
+                    except Exception:
+                        combined_total = None
+
+        elif params.mode == "flight_hotel_month":
+            # 항공 한달 스캔 전에 키부터 확인
+            _require_liteapi_key()
+
+            best_flight = find_cheapest_flight_in_month(
+                year=params.year,
+                month=params.month,
+                origin=params.origin,
+                dest=params.dest,
+                trip=params.trip,
+                stay_nights=params.nights,
+                adults=params.flight_adults,
+                seat=params.seat,
+            )
+
+            if best_flight:
+                flight_price_krw = _to_krw(best_flight)
+
+                ci = best_flight.depart_date
+                co = best_flight.return_date if best_flight.return_date else (ci + timedelta(days=params.nights))
 
-                # 호텔은 여행기간 그대로
                 fh_hotels = search_hotels_for_dates(
-                    checkin=checkin,
-                    checkout=checkout,
-                    city_name=city,
-                    country_code=country,
-                    adults=adults,  
-                    min_star=min_stars,
-                    max_star=max_stars,
-                    limit=limit,
-                    currency=currency,
-                    nationality=guest_nat,
+                    checkin=ci,
+                    checkout=co,
+                    city_name=params.city,
+                    country_code=params.country,
+                    adults=params.adults,
+                    min_star=params.min_stars,
+                    max_star=params.max_stars,
+                    limit=params.limit,
+                    currency=params.currency,
+                    nationality=params.guest_nat,
+                    top_k=params.fh_top_n,
                 ) or []
-                fh_hotels = fh_hotels[:fh_top_n]
-
-                if best_flight:
-                    raw = getattr(best_flight, "price_raw", "") or ""
-                    if "$" in raw or getattr(best_flight, "currency", "") == "USD":
-                        try:
-                            flight_price_krw = int(float(best_flight.price_value) * USD_TO_KRW)
-                        except Exception:
-                            flight_price_krw = None
-                    else:
-                        try:
-                            flight_price_krw = int(float(best_flight.price_value))
-                        except Exception:
-                            flight_price_krw = None
 
                 if fh_hotels:
                     combo_hotel = fh_hotels[0]
@@ -456,84 +867,12 @@ def travel():
                         except Exception:
                             combined_total = None
 
-            elif mode == "flight_hotel_month":
-                best_flight = find_cheapest_flight_in_month(
-                    year=year,
-                    month=month,
-                    origin=origin,
-                    dest=dest,
-                    trip=trip,
-                    stay_nights=nights,
-                    adults=flight_adults,
-                    seat=seat,
-                )
+    except (requests.Timeout, requests.ConnectionError) as e:
+        error = f"외부 API 연결/응답 시간 초과 ({type(e).__name__}). 잠시 후 다시 시도해 주세요."
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
 
-                if best_flight:
-                    raw = getattr(best_flight, "price_raw", "") or ""
-                    if "$" in raw or getattr(best_flight, "currency", "") == "USD":
-                        try:
-                            flight_price_krw = int(float(best_flight.price_value) * USD_TO_KRW)
-                        except Exception:
-                            flight_price_krw = None
-                    else:
-                        try:
-                            flight_price_krw = int(float(best_flight.price_value))
-                        except Exception:
-                            flight_price_krw = None
-
-                    ci = best_flight.depart_date
-                    co = best_flight.return_date if best_flight.return_date else (ci + timedelta(days=nights))
-
-                    fh_hotels = search_hotels_for_dates(
-                        checkin=ci,
-                        checkout=co,
-                        city_name=city,
-                        country_code=country,
-                        adults=adults,
-                        min_star=min_stars,
-                        max_star=max_stars,
-                        limit=limit,
-                        currency=currency,
-                        nationality=guest_nat,
-                    ) or []
-                    fh_hotels = fh_hotels[:fh_top_n]
-
-                    if fh_hotels:
-                        combo_hotel = fh_hotels[0]
-                        if flight_price_krw is not None:
-                            try:
-                                combined_total = int(flight_price_krw) + int(combo_hotel.total_price)
-                            except Exception:
-                                combined_total = None
-
-        except Exception as e:
-            error = f"{type(e).__name__}: {e}"
-
-    return render_template(
-        "travel.html",
-        # mode / inputs
-        mode=mode,
-        city=city,
-        country=country,
-        adults=adults,
-        min_stars=min_stars,
-        max_stars=max_stars,
-        currency=currency,
-        guest_nat=guest_nat,
-        checkin=checkin_s,
-        checkout=checkout_s,
-        top_n=top_n,
-        limit=limit,
-        year=year,
-        month=month,
-        nights=nights,
-        origin=origin,
-        dest=dest,
-        trip=trip,
-        seat=seat,
-        flight_adults=flight_adults,
-        fh_top_n=fh_top_n,
-        # results
+    ctx.update(
         period_rows=period_rows,
         monthly_results=monthly_results,
         hotel_cheapest=hotel_cheapest,
@@ -542,18 +881,17 @@ def travel():
         combo_hotel=combo_hotel,
         flight_price_krw=flight_price_krw,
         combined_total=combined_total,
+        stale=any(r.stale for r in monthly_results) or any(h.stale for h in fh_hotels),
         error=error,
-        # access key hint
-        has_access_key=bool(ACCESS_KEY),
-        current_key=request.args.get("key") or request.form.get("key") or "",
     )
+    return stream_template(_page("travel.html"), **ctx)
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", "5000")), debug=True)
-
-
-
-
-
-
+    # 로컬 개발 서버 (배포는 gunicorn). 디버거/리로더는 FLASK_DEBUG=1일 때만
+    app.run(
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", "5000")),
+        debug=os.environ.get("FLASK_DEBUG") == "1",
+        threaded=True,
+    )
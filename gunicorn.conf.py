@@ -0,0 +1,14 @@
+# gunicorn이 작업 폴더의 이 파일을 자동으로 읽음 -> Render Start 명령은 `gunicorn app:app` 그대로
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# /travel은 거의 전부 LiteAPI/Google 대기(I/O) -> 스레드 워커로 워커당 여러 요청을 동시에 처리
+# 호출 속도 제한(token bucket)/동시 호출 상한은 프로세스마다 따로 -> 기본은 1개 워커 + 스레드로 동시성
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+threads = int(os.environ.get("GUNICORN_THREADS", "16"))
+
+# 한달 스캔은 30초(기본값)를 넘길 수 있음 -> 워커가 중간에 죽지 않도록 여유 있게
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "180"))
+keepalive = 5